@@ -2,11 +2,11 @@
 # -*- coding: utf-8 -*-
 
 import random
+from itertools import accumulate, combinations_with_replacement
 from pathlib import Path
 from dataclasses import dataclass
 import pandas as pd
 import streamlit as st
-from io import StringIO
 
 # --- Bilder ---
 from PIL import Image
@@ -25,31 +25,53 @@ IMG_FILES = {
 BLUFF_PROBS = {"low":0.70,"medium":0.40,"high":0.10,"none":1.00}
 SIGNAL_REF   = {"high":16.0,"medium":12.5,"low":7.5}
 BELIEVE_OFFSET = 1.0
+LOG_VIEW_ROWS = 50
+CARD_CAPTIONS = ("Karte 1", "Karte 2")
 
+SIGNALS = ("low", "medium", "high")
+# Bluff-Signale je wahrer Kategorie (alle außer der wahren; bei "none" alle)
+BLUFF_OPTS = {cat: tuple(s for s in SIGNALS if s != cat) for cat in SIGNALS + ("none",)}
 SIG_INT_TO_DE = {"low":"tief", "medium":"mittel", "high":"hoch"}
 SIG_DE_TO_INT = {"tief":"low", "mittel":"medium", "hoch":"high"}
 
 # ---------------- Utility ----------------
+# Kategorien gemäß deiner Spezifikation
+POINTS_TO_CAT = {
+    16: "high",                 # K+6
+    12: "medium", 13: "medium",
+    6: "low", 9: "low",
+    20: "none",                 # K+K: keine wahre Kategorie -> muss bluffen
+}
+
 def categorize(points: int) -> str:
     """ Kategorien gemäß deiner Spezifikation. """
-    if points == 16: return "high"      # K+6
-    if points in (12, 13): return "medium"
-    if points in (6, 9): return "low"
-    if points == 20: return "none"      # K+K: keine wahre Kategorie -> muss bluffen
-    return "none"
+    return POINTS_TO_CAT.get(points, "none")
 
 def label_category(cat: str) -> str:
     return {"high":"Hoch","medium":"Mittel","low":"Tief","none":"Überspielt"}.get(cat,"??")
 
-def draw_two_cards():
-    deck = ["K"]*4 + ["6"]*4 + ["3"]*4
-    cards = random.sample(deck, 2)
-    return cards, sum(CARD_TO_POINTS[c] for c in cards)
+def _hand_record(hand):
+    s = sum(CARD_TO_POINTS[c] for c in hand)
+    cat = categorize(s)
+    # hand ist aufsteigend sortiert ("3" < "6" < "K") -> umgekehrt ergibt den Policy-Schlüssel ("k,6")
+    return {"sum": s, "cat": cat, "key": ",".join(c.lower() for c in reversed(hand)),
+            "cards_str": "/".join(hand), "cat_label": label_category(cat)}
 
-def canon_hand(cards):
-    order = {"K":2, "6":1, "3":0}
-    a, b = sorted(cards, key=lambda c: order[c], reverse=True)
-    return f"{a.lower()},{b.lower()}"
+# Summe, Kategorie und Log-Texte je Hand einmalig vorberechnen (Schlüssel = sortiertes Tupel)
+HAND_INFO = {h: _hand_record(h) for h in combinations_with_replacement(sorted(CARD_TO_POINTS), 2)}
+
+# Deck: je 4x K/6/3 -> Häufigkeit jeder Hand unter den C(12,2)=66 Zügen
+CARDS_PER_RANK = 4
+HANDS_POPULATION = list(HAND_INFO)
+HANDS_WEIGHTS = [
+    CARDS_PER_RANK*(CARDS_PER_RANK-1)//2 if a == b else CARDS_PER_RANK*CARDS_PER_RANK
+    for a, b in HANDS_POPULATION
+]
+
+def draw_two_cards():
+    # Rückgabe ist das sortierte Hand-Tupel: Karten- und Log-Reihenfolge sind kanonisch ("3/K", "6/K")
+    cards = random.choices(HANDS_POPULATION, weights=HANDS_WEIGHTS, k=1)[0]
+    return cards, HAND_INFO[cards]["sum"]
 
 def payoff(truthful, believed, sum_s, sum_r):
     """ Rückgabe: (delta_p1, delta_p2) """
@@ -62,12 +84,12 @@ def payoff(truthful, believed, sum_s, sum_r):
     return (-1,1)
 
 # ---------------- Bilder laden ----------------
-@st.cache_data(show_spinner=False)
-def load_card_image(key: str, target_h: int = 180):
+def _load_and_resize(key: str, target_h: int):
     for name in IMG_FILES[key]:
         p = IMAGES_DIR / name
         if p.exists():
             img = Image.open(p)
+            img.load()
             # proportional auf Höhe target_h
             w, h = img.size
             if h != target_h:
@@ -76,68 +98,94 @@ def load_card_image(key: str, target_h: int = 180):
             return img
     return None  # Fallback: kein Bild vorhanden
 
+# cache_resource: alle Kartenbilder einmal laden/skalieren und per Referenz teilen
+@st.cache_resource(show_spinner=False)
+def all_card_images(target_h: int = 180):
+    return {k: _load_and_resize(k, target_h) for k in IMG_FILES}
+
 # ---------------- BNE-Policies laden ----------------
-@st.cache_data(show_spinner=False)
+# cache_resource: Policies sind nach dem Laden unveränderlich -> per Referenz teilen
+@st.cache_resource(show_spinner=False)
 def load_policies():
     POLICY_P1, POLICY_P2 = {}, {}
     p1_path = DATA_DIR / "Bayes-Nash__gemischt____SP1_Signalpolitik.csv"
     p2_path = DATA_DIR / "Bayes-Nash__gemischt____SP2_Antwortpolitik.csv"
     try:
         df1 = pd.read_csv(p1_path)
-        for _, row in df1.iterrows():
-            h = str(row.get("SP1 Hand","")).strip().lower()
-            if not h: continue
-            POLICY_P1[h] = {
-                "low": float(row.get("P(Signal=tief)", 0) or 0),
-                "medium": float(row.get("P(Signal=mittel)", 0) or 0),
-                "high": float(row.get("P(Signal=hoch)", 0) or 0),
-            }
+        df1["SP1 Hand"] = df1["SP1 Hand"].fillna("").astype(str).str.strip().str.lower()
+        df1 = df1[df1["SP1 Hand"] != ""].rename(columns={
+            "P(Signal=tief)": "low", "P(Signal=mittel)": "medium", "P(Signal=hoch)": "high",
+        })
+        probs = (df1.set_index("SP1 Hand")
+                    .reindex(columns=list(SIGNALS))
+                    .fillna(0).astype(float))
+        # je Hand (Signale, normierte kumulierte Gewichte) für random.choices;
+        # Hände ohne Gewicht -> Heuristik
+        for h, w in zip(probs.index, probs.to_numpy().tolist()):
+            t = sum(w)
+            if t > 0:
+                POLICY_P1[h] = (SIGNALS, tuple(accumulate(v / t for v in w)))
     except Exception:
         pass
 
     try:
         df2 = pd.read_csv(p2_path)
-        for _, row in df2.iterrows():
-            h = str(row.get("SP2 Hand","")).strip().lower()
-            sig = str(row.get("Signal","")).strip().lower()
-            if not h or not sig: continue
-            POLICY_P2[(h, sig)] = float(row.get("P(glaubt)", 0) or 0)
+        for col in ("SP2 Hand", "Signal"):
+            df2[col] = df2[col].fillna("").astype(str).str.strip().str.lower()
+        df2 = df2[(df2["SP2 Hand"] != "") & (df2["Signal"] != "")]
+        POLICY_P2 = (df2.set_index(["SP2 Hand", "Signal"])["P(glaubt)"]
+                        .fillna(0).astype(float)
+                        .to_dict())
     except Exception:
         pass
 
     return POLICY_P1, POLICY_P2
 
 # ---------------- Computerpolitik (BNE + Fallback) ----------------
-def bne_signal(cards, POLICY_P1):
-    """BNE-Signal (falls vorhanden), sonst Heuristik."""
-    h = canon_hand(cards)
-    if h in POLICY_P1:
-        probs = POLICY_P1[h]
-        total = sum(probs.values()) or 1.0
-        r = random.random() * total
-        acc = 0.0
-        for k, v in probs.items():
-            acc += v
-            if r <= acc:
-                sig = k
-                truthful = (categorize(sum(CARD_TO_POINTS[c] for c in cards)) == sig)
-                return sig, truthful
+_getrandbits = random.getrandbits
+
+def _rand_batch4():
+    """
+    Vier unabhängige Gleichverteilte in [0, 1) aus einem einzigen 64-Bit-Zufallswort (je 16 Bit).
+    Die Werte liegen auf dem Raster k/2^16; Schwellen-Vergleiche sind damit auf 2^-16 genau.
+    """
+    w = _getrandbits(64)
+    return ((w & 0xFFFF) / 65536.0, ((w >> 16) & 0xFFFF) / 65536.0,
+            ((w >> 32) & 0xFFFF) / 65536.0, (w >> 48) / 65536.0)
+
+def _pick(opts, u):
+    """ Unverzerrte Auswahl aus opts mit einer Gleichverteilten aus _rand_batch4 (Rest-Bereich -> Neuzug). """
+    n = len(opts)
+    v = int(u * 65536)  # exakt: u = v / 2^16
+    if v < 65536 - 65536 % n:
+        return opts[v % n]
+    return random.choice(opts)
+
+def bne_signal(cards, POLICY_P1, r=None):
+    """BNE-Signal (falls vorhanden), sonst Heuristik. r: optionale Gleichverteilte für den Bluff-Entscheid."""
+    info = HAND_INFO[tuple(sorted(cards))]
+    true_cat = info["cat"]
+    if info["key"] in POLICY_P1:
+        keys, cum_weights = POLICY_P1[info["key"]]
+        sig = random.choices(keys, cum_weights=cum_weights, k=1)[0]
+        return sig, (true_cat == sig)
     # Fallback Heuristik
-    own_sum = sum(CARD_TO_POINTS[c] for c in cards)
-    true_cat = categorize(own_sum)
-    will_bluff = (true_cat == "none") or (random.random() < BLUFF_PROBS[true_cat])
+    if r is None:
+        r = random.random()
+    will_bluff = (true_cat == "none") or (r < BLUFF_PROBS[true_cat])
     if not will_bluff:
         return true_cat, True
-    options = [s for s in ["low","medium","high"] if s != true_cat]
-    return random.choice(options), False
+    return random.choice(BLUFF_OPTS[true_cat]), False
 
-def bne_response(signal, cards, POLICY_P2):
-    """BNE-Antwort (falls vorhanden), sonst Heuristik."""
-    h = canon_hand(cards)
-    key = (h, SIG_INT_TO_DE[signal])
+def bne_response(signal, cards, POLICY_P2, r=None):
+    """BNE-Antwort (falls vorhanden), sonst Heuristik. r: optionale Gleichverteilte für den Glauben-Entscheid."""
+    info = HAND_INFO[tuple(sorted(cards))]
+    key = (info["key"], SIG_INT_TO_DE[signal])
     if key in POLICY_P2:
-        return "believe" if random.random() < POLICY_P2[key] else "doubt"
-    own_sum = sum(CARD_TO_POINTS[c] for c in cards)
+        if r is None:
+            r = random.random()
+        return "believe" if r < POLICY_P2[key] else "doubt"
+    own_sum = info["sum"]
     return "believe" if own_sum >= (SIGNAL_REF[signal] - BELIEVE_OFFSET) else "doubt"
 
 def pc_choose_signal(cards, optimal_prob, POLICY_P1):
@@ -145,24 +193,27 @@ def pc_choose_signal(cards, optimal_prob, POLICY_P1):
     Mit Wahrscheinlichkeit optimal_prob BNE/Heuristik; sonst zufällig (50/50 Wahrheit/Bluff, falls möglich).
     Rückgabe: (signal, truthful, policy_tag)
     """
-    if random.random() < optimal_prob:
-        sig, truth = bne_signal(cards, POLICY_P1)
+    u_opt, u_bluff, u_truth, u_pick = _rand_batch4()
+    if u_opt < optimal_prob:
+        sig, truth = bne_signal(cards, POLICY_P1, u_bluff)
         return sig, truth, "optimal"
-    true_cat = categorize(sum(CARD_TO_POINTS[c] for c in cards))
-    if true_cat == "none":
-        options = ["low","medium","high"]
-        return random.choice(options), False, "random"
-    if random.random() < 0.5:
+    true_cat = HAND_INFO[tuple(sorted(cards))]["cat"]
+    if true_cat != "none" and u_truth < 0.5:
         return true_cat, True, "random"
-    options = [s for s in ["low","medium","high"] if s != true_cat]
-    return random.choice(options), False, "random"
+    return _pick(BLUFF_OPTS[true_cat], u_pick), False, "random"
 
 def pc_choose_response(signal, cards, optimal_prob, POLICY_P2):
-    if random.random() < optimal_prob:
-        return bne_response(signal, cards, POLICY_P2), "optimal"
-    return ("believe" if random.random() < 0.5 else "doubt"), "random"
+    u_opt, u_resp, u_coin, _ = _rand_batch4()
+    if u_opt < optimal_prob:
+        return bne_response(signal, cards, POLICY_P2, u_resp), "optimal"
+    return ("believe" if u_coin < 0.5 else "doubt"), "random"
 
 # ---------------- Session-State ----------------
+LOG_COLUMNS = ("round","human_role","p1_cards","p2_cards","p1_sum","p2_sum",
+               "p1_category","p2_category","signal","truthful","responder_believed",
+               "pc_p1_policy","pc_p2_policy","delta_p1","delta_p2","p1_pts","p2_pts",
+               "human_pts","pc_pts","optimal_prob")
+
 def init_state():
     if "round" not in st.session_state:
         st.session_state.round = 0
@@ -194,9 +245,9 @@ def init_state():
         if k not in st.session_state:
             st.session_state[k] = None if k not in ("awaiting_response","finished") else False
 
-    # Logging: Liste von Dict-Zeilen
-    if "logs" not in st.session_state:
-        st.session_state.logs = []
+    # Logging: eine Liste je Spalte (DataFrame direkt aus dict-of-lists)
+    if "log_cols" not in st.session_state:
+        st.session_state.log_cols = {c: [] for c in LOG_COLUMNS}
 
 # ---------------- Neue Runde ----------------
 def new_round():
@@ -219,80 +270,100 @@ def new_round():
 
 # ---------------- Auflösen & Loggen ----------------
 def finish_round(believed, POLICY_P1, POLICY_P2):
-    ds, dr = payoff(st.session_state.truth, believed,
-                    st.session_state.p1_sum, st.session_state.p2_sum)
+    ss = st.session_state
+    p1_cards, p2_cards, p1_sum, p2_sum = ss.p1_cards, ss.p2_cards, ss.p1_sum, ss.p2_sum
+    truth, cur_sig, human_is_p1 = ss.truth, ss.cur_sig, ss.human_is_p1
+    p1_info, p2_info = HAND_INFO[tuple(sorted(p1_cards))], HAND_INFO[tuple(sorted(p2_cards))]
+    ds, dr = payoff(truth, believed, p1_sum, p2_sum)
 
     # Rollenpunkte (P1/P2)
-    st.session_state.p1_pts += ds
-    st.session_state.p2_pts += dr
+    p1_pts, p2_pts = ss.p1_pts + ds, ss.p2_pts + dr
 
     # Personenpunkte (Du/PC) – korrekt mappen
-    if st.session_state.human_is_p1:
+    if human_is_p1:
         human_delta, pc_delta = ds, dr
     else:
         human_delta, pc_delta = dr, ds
-    st.session_state.human_pts += human_delta
-    st.session_state.pc_pts    += pc_delta
+    human_pts, pc_pts = ss.human_pts + human_delta, ss.pc_pts + pc_delta
+
+    ss.p1_pts, ss.p2_pts = p1_pts, p2_pts
+    ss.human_pts, ss.pc_pts = human_pts, pc_pts
 
     # Log-Zeile erstellen
     log_row = {
-        "round": st.session_state.round,
-        "human_role": "P1" if st.session_state.human_is_p1 else "P2",
-        "p1_cards": "/".join(st.session_state.p1_cards),
-        "p2_cards": "/".join(st.session_state.p2_cards),
-        "p1_sum": st.session_state.p1_sum,
-        "p2_sum": st.session_state.p2_sum,
-        "p1_category": label_category(categorize(st.session_state.p1_sum)),
-        "p2_category": label_category(categorize(st.session_state.p2_sum)),
-        "signal": label_category(st.session_state.cur_sig) if st.session_state.cur_sig else "",
-        "truthful": 1 if (st.session_state.truth is True) else 0,
+        "round": ss.round,
+        "human_role": "P1" if human_is_p1 else "P2",
+        "p1_cards": p1_info["cards_str"],
+        "p2_cards": p2_info["cards_str"],
+        "p1_sum": p1_sum,
+        "p2_sum": p2_sum,
+        "p1_category": p1_info["cat_label"],
+        "p2_category": p2_info["cat_label"],
+        "signal": label_category(cur_sig) if cur_sig else "",
+        "truthful": 1 if (truth is True) else 0,
         "responder_believed": 1 if believed else 0,
-        "pc_p1_policy": st.session_state.pc_p1_policy or "",
-        "pc_p2_policy": st.session_state.pc_p2_policy or "",
+        "pc_p1_policy": ss.pc_p1_policy or "",
+        "pc_p2_policy": ss.pc_p2_policy or "",
         "delta_p1": ds, "delta_p2": dr,
-        "p1_pts": st.session_state.p1_pts, "p2_pts": st.session_state.p2_pts,
-        "human_pts": st.session_state.human_pts, "pc_pts": st.session_state.pc_pts,
-        "optimal_prob": round(st.session_state.optimal_prob, 2),
+        "p1_pts": p1_pts, "p2_pts": p2_pts,
+        "human_pts": human_pts, "pc_pts": pc_pts,
+        "optimal_prob": round(ss.optimal_prob, 2),
     }
-    st.session_state.logs.append(log_row)
-    st.session_state.finished = True
+    log_cols = ss.log_cols
+    for c, v in log_row.items():
+        log_cols[c].append(v)
+    ss.finished = True
+
+def log_csv():
+    """CSV-Bytes der Logs; nur neu erzeugt, wenn seit dem letzten Aufruf Zeilen dazukamen."""
+    ss = st.session_state
+    n = len(ss.log_cols["round"])
+    if ss.get("log_csv_len") != n:
+        ss.log_csv = pd.DataFrame(ss.log_cols, copy=False).to_csv(index=False).encode("utf-8")
+        ss.log_csv_len = n
+    return ss.log_csv
 
 # ---------------- Streamlit UI ----------------
-def main():
-    st.set_page_config(page_title="Playing Eyes – Bluff Game", layout="wide")
-    init_state()
-    POLICY_P1, POLICY_P2 = load_policies()
-
-    # Sidebar: Schwierigkeit + Kontrolle
-    st.sidebar.header("Einstellungen")
-    col_diff = st.sidebar.columns([1,2,1])
-    if col_diff[0].button("−", help="Schwierigkeit verringern (−25%)"):
-        st.session_state.optimal_prob = max(0.0, round(st.session_state.optimal_prob - 0.25, 2))
+def change_difficulty(delta: float):
+    """ Callback der +/−-Buttons: läuft vor dem Fragment, die Anzeige ist damit sofort aktuell. """
+    st.session_state.optimal_prob = min(1.0, max(0.0, round(st.session_state.optimal_prob + delta, 2)))
+
+@st.fragment
+def sidebar_controls():
+    """Schwierigkeit; Klicks rerunnen nur dieses Fragment, nicht die Spiel-Panels."""
+    col_diff = st.columns([1,2,1])
+    col_diff[0].button("−", help="Schwierigkeit verringern (−25%)",
+                       on_click=change_difficulty, args=(-0.25,))
     col_diff[1].markdown(f"**PC-Genauigkeit:** {int(st.session_state.optimal_prob*100)}%")
-    if col_diff[2].button("+", help="Schwierigkeit erhöhen (+25%)"):
-        st.session_state.optimal_prob = min(1.0, round(st.session_state.optimal_prob + 0.25, 2))
+    col_diff[2].button("+", help="Schwierigkeit erhöhen (+25%)",
+                       on_click=change_difficulty, args=(0.25,))
 
-    if st.sidebar.button("Neues Spiel (Reset)"):
-        for k in list(st.session_state.keys()):
-            del st.session_state[k]
-        init_state()
-        new_round()
+@st.fragment
+def game_panels(POLICY_P1, POLICY_P2):
+    """Spielbereich; Spiel-Buttons rerunnen dieses Fragment, Rundenwechsel die ganze App."""
+    ss = st.session_state
+    # optimal_prob wird bei jedem Lauf frisch gelesen -> Änderungen aus der Sidebar greifen beim nächsten Zug
+    optimal_prob = ss.optimal_prob
 
     # Header
-    c1, c2, c3 = st.columns([1,2,1])
-    c1.markdown(f"### Runde: {st.session_state.round}")
-    c2.markdown(f"**Diese Runde: Du bist Spieler {'1' if st.session_state.human_is_p1 else '2'}**")
-    c3.metric("PC-Genauigkeit", f"{int(st.session_state.optimal_prob*100)}%")
+    c1, c2 = st.columns([1,3])
+    c1.markdown(f"### Runde: {ss.round}")
+    c2.markdown(f"**Diese Runde: Du bist Spieler {'1' if ss.human_is_p1 else '2'}**")
 
     # Scores (Du vs PC – konstant!)
     s1, s2 = st.columns(2)
-    s1.metric("Du", st.session_state.human_pts)
-    s2.metric("PC", st.session_state.pc_pts)
+    s1.metric("Du", ss.human_pts)
+    s2.metric("PC", ss.pc_pts)
 
     # Erste Runde automatisch starten
-    if st.session_state.round == 0:
+    if ss.round == 0:
         new_round()
 
+    # Ab hier ändern sich Rolle und Karten in diesem Durchlauf nicht mehr
+    human_is_p1 = ss.human_is_p1
+    p1_cards, p2_cards = ss.p1_cards, ss.p2_cards
+    p1_info, p2_info = HAND_INFO[tuple(sorted(p1_cards))], HAND_INFO[tuple(sorted(p2_cards))]
+
     # Panels: Links P1 (Signal) / Rechts P2 (Antwort)
     left, right = st.columns(2)
 
@@ -300,85 +371,68 @@ def main():
     with left:
         st.subheader("Spieler 1 (Signal)")
         # Anzeige wahre Kategorie (nur sichtbar, wenn Du in dieser Runde P1 bist)
-        p1_cat = label_category(categorize(st.session_state.p1_sum))
+        p1_cat = p1_info["cat_label"]
         st.caption(
-            f"Wahre Kategorie: {p1_cat if (st.session_state.human_is_p1 or st.session_state.finished) else '??'}"
+            f"Wahre Kategorie: {p1_cat if (human_is_p1 or ss.finished) else '??'}"
         )
 
         # Signal-Buttons (nur wenn Mensch P1 & Runde nicht fertig)
-        if st.session_state.human_is_p1 and not st.session_state.finished:
+        if human_is_p1 and not ss.finished:
             btn_cols = st.columns(3)
-            if btn_cols[0].button("Signal: Hoch (nur 16)"):
-                st.session_state.cur_sig = "high"
-                st.session_state.truth = (categorize(st.session_state.p1_sum) != "none" and
-                                          categorize(st.session_state.p1_sum) == "high")
-                # PC antwortet
-                resp, pol = pc_choose_response("high", st.session_state.p2_cards,
-                                               st.session_state.optimal_prob, POLICY_P2)
-                st.session_state.pc_p2_policy = pol
-                finish_round(resp == "believe", POLICY_P1, POLICY_P2)
-
-            if btn_cols[1].button("Signal: Mittel (12–13)"):
-                st.session_state.cur_sig = "medium"
-                st.session_state.truth = (categorize(st.session_state.p1_sum) != "none" and
-                                          categorize(st.session_state.p1_sum) == "medium")
-                resp, pol = pc_choose_response("medium", st.session_state.p2_cards,
-                                               st.session_state.optimal_prob, POLICY_P2)
-                st.session_state.pc_p2_policy = pol
-                finish_round(resp == "believe", POLICY_P1, POLICY_P2)
-
-            if btn_cols[2].button("Signal: Tief (6–9)"):
-                st.session_state.cur_sig = "low"
-                st.session_state.truth = (categorize(st.session_state.p1_sum) != "none" and
-                                          categorize(st.session_state.p1_sum) == "low")
-                resp, pol = pc_choose_response("low", st.session_state.p2_cards,
-                                               st.session_state.optimal_prob, POLICY_P2)
-                st.session_state.pc_p2_policy = pol
-                finish_round(resp == "believe", POLICY_P1, POLICY_P2)
-
+            for col, (label, sig) in zip(btn_cols, (("Signal: Hoch (nur 16)", "high"),
+                                                    ("Signal: Mittel (12–13)", "medium"),
+                                                    ("Signal: Tief (6–9)", "low"))):
+                if col.button(label):
+                    ss.cur_sig = sig
+                    ss.truth = (p1_info["cat"] == sig)
+                    # PC antwortet
+                    resp, pol = pc_choose_response(sig, p2_cards, optimal_prob, POLICY_P2)
+                    ss.pc_p2_policy = pol
+                    finish_round(resp == "believe", POLICY_P1, POLICY_P2)
+
+        finished = ss.finished
+        cur_sig = ss.cur_sig
 
             # Karten anzeigen: nach Abschluss IMMER offen; sonst nur, wenn du P1 bist
-        reveal_p1 = st.session_state.finished or st.session_state.human_is_p1
-        render_cards(st.session_state.p1_cards, reveal=reveal_p1)
+        reveal_p1 = finished or human_is_p1
+        render_cards(p1_cards, reveal=reveal_p1)
 
         # Gezeigtes Signal (falls vorhanden)
-        if st.session_state.cur_sig:
-            st.info(f"Signal: **{label_category(st.session_state.cur_sig)}**")
+        if cur_sig:
+            st.info(f"Signal: **{label_category(cur_sig)}**")
 
         # Nach Abschluss: Zeige ggf. PC-Entscheidung (wenn PC Responder war)
-        if st.session_state.finished and st.session_state.human_is_p1 and st.session_state.logs:
-            believed = bool(st.session_state.logs[-1]["responder_believed"])
+        if finished and human_is_p1 and ss.log_cols["round"]:
+            believed = bool(ss.log_cols["responder_believed"][-1])
             st.success(f"PC-Antwort: **{'glaubt' if believed else 'zweifelt'}**")
 
 
     # --- RECHTES PANEL: Spieler 2 (Antwort) ---
     with right:
         st.subheader("Spieler 2 (Antwort)")
-        p2_cat = label_category(categorize(st.session_state.p2_sum))
+        p2_cat = p2_info["cat_label"]
         st.caption(
-            f"Wahre Kategorie: {p2_cat if ((not st.session_state.human_is_p1) or st.session_state.finished) else '??'}"
+            f"Wahre Kategorie: {p2_cat if ((not human_is_p1) or finished) else '??'}"
         )
 
 
         # Wenn PC P1 ist, signalisiert er sofort – Mensch antwortet:
-        if (not st.session_state.human_is_p1) and (st.session_state.cur_sig is None):
-            sig, truth, pol = pc_choose_signal(st.session_state.p1_cards,
-                                               st.session_state.optimal_prob, POLICY_P1)
-            st.session_state.cur_sig = sig
-            st.session_state.truth = truth
-            st.session_state.pc_p1_policy = pol
+        if (not human_is_p1) and (cur_sig is None):
+            sig, truth, pol = pc_choose_signal(p1_cards, optimal_prob, POLICY_P1)
+            ss.cur_sig, ss.truth, ss.pc_p1_policy = sig, truth, pol
+            cur_sig = sig
             st.info(f"Spieler 1 signalisiert: **{label_category(sig)}** – Deine Antwort?")
 
 
             # Wenn die Runde fertig ist und der PC P1 war: sein Signal + (Wahr/Bluff) noch mal klar anzeigen
-        if st.session_state.finished and (not st.session_state.human_is_p1):
-            sig_txt = label_category(st.session_state.cur_sig)
-            p1_strat = "Wahr" if st.session_state.truth else "Bluff"
+        if finished and (not human_is_p1):
+            sig_txt = label_category(cur_sig)
+            p1_strat = "Wahr" if ss.truth else "Bluff"
             st.info(f"PC-Signal: **{sig_txt}** ({p1_strat})")
 
         
         # Antwort-Buttons (nur wenn Mensch P2 & Runde nicht fertig)
-        if (not st.session_state.human_is_p1) and (not st.session_state.finished):
+        if (not human_is_p1) and (not finished):
             rcols = st.columns(2)
             if rcols[0].button("Glauben"):
                 finish_round(True, POLICY_P1, POLICY_P2)
@@ -391,14 +445,14 @@ def main():
 
 
             # Kartenanzeige: nach Abschluss IMMER offen; sonst nur, wenn du P2 bist
-        reveal_p2 = st.session_state.finished or (not st.session_state.human_is_p1)
-        render_cards(st.session_state.p2_cards, reveal=reveal_p2)
+        reveal_p2 = finished or (not human_is_p1)
+        render_cards(p2_cards, reveal=reveal_p2)
 
         # Nach Abschluss: Zeige die Entscheidung der Person auf der rechten Seite
-        if st.session_state.finished and st.session_state.logs:
-            believed = bool(st.session_state.logs[-1]["responder_believed"])
+        if finished and ss.log_cols["round"]:
+            believed = bool(ss.log_cols["responder_believed"][-1])
             # Wenn du P2 warst, hast DU geantwortet -> zeige deine Antwort hier
-            if not st.session_state.human_is_p1:
+            if not human_is_p1:
                 st.success(f"Deine Antwort: **{'glauben' if believed else 'zweifeln'}**")
             else:
                 # Du warst P1 -> PC war P2, seine Antwort siehst du links schon;
@@ -409,16 +463,16 @@ def main():
     st.markdown("---")
 
     # ---------------- Rundenergebnis ----------------
-    if st.session_state.finished:
-        sig_txt = label_category(st.session_state.cur_sig)
-        p1_strat = "Wahr" if st.session_state.truth else "Bluff"
+    log_cols = ss.log_cols
+    if finished:
+        sig_txt = label_category(cur_sig)
+        p1_strat = "Wahr" if ss.truth else "Bluff"
 
         # Wer hat geglaubt/gezweifelt? -> hängt davon ab, wer P2 ist.
-        last_log = st.session_state.logs[-1]
-        believed = bool(last_log["responder_believed"])
+        believed = bool(log_cols["responder_believed"][-1])
         p2_strat = "glaubt" if believed else "zweifelt"
 
-        ds, dr = last_log["delta_p1"], last_log["delta_p2"]
+        ds, dr = log_cols["delta_p1"][-1], log_cols["delta_p2"][-1]
         if ds > dr: round_winner = "Spieler 1"
         elif dr > ds: round_winner = "Spieler 2"
         else: round_winner = "Unentschieden"
@@ -434,14 +488,14 @@ def main():
 
     # ---------------- CSV-Download (Logs) ----------------
     st.markdown("### Runden-Log")
-    if st.session_state.logs:
-        df_log = pd.DataFrame(st.session_state.logs)
-        st.dataframe(df_log, use_container_width=True, hide_index=True)
-        csv_buf = StringIO()
-        df_log.to_csv(csv_buf, index=False)
+    if log_cols["round"]:
+        # Anzeige nur der letzten Runden; der Download enthält das vollständige Log
+        with st.expander("Log anzeigen", expanded=False):
+            df_log = pd.DataFrame({c: v[-LOG_VIEW_ROWS:] for c, v in log_cols.items()}, copy=False)
+            st.dataframe(df_log, use_container_width=True, hide_index=True)
         st.download_button(
             "Log als CSV herunterladen",
-            data=csv_buf.getvalue(),
+            data=log_csv(),
             file_name="playing_eyes_log.csv",
             mime="text/csv"
         )
@@ -449,16 +503,39 @@ def main():
         st.info("Noch keine Runden geloggt. Spiele eine Runde 🙂")
 
 
-def render_cards(cards, reveal: bool, caption=("Karte 1", "Karte 2")):
+def main():
+    st.set_page_config(page_title="Playing Eyes – Bluff Game", layout="wide")
+    init_state()
+    POLICY_P1, POLICY_P2 = load_policies()
+
+    # Sidebar: Schwierigkeit + Kontrolle
+    with st.sidebar:
+        st.header("Einstellungen")
+        sidebar_controls()
+        if st.button("Neues Spiel (Reset)"):
+            st.session_state.clear()
+            init_state()
+            new_round()
+
+    game_panels(POLICY_P1, POLICY_P2)
+
+
+def render_cards(cards, reveal: bool, caption=CARD_CAPTIONS):
     """Zeigt 2 Kartenbilder, falls reveal=True; sonst '?? ??'."""
-    if reveal:
-        imgs = [img for img in (load_card_image(cards[0]), load_card_image(cards[1])) if img is not None]
-        if imgs:
-            st.image(imgs, caption=list(caption), width=100)
-        else:
-            st.write("**Karten:** (Bilder fehlen)")
-    else:
+    if not reveal:
         st.write("**Karten:** ??  ??")
+        return
+    imgs = all_card_images()
+    img1, img2 = imgs[cards[0]], imgs[cards[1]]
+    if img1 is not None and img2 is not None:
+        st.image([img1, img2], caption=list(caption), width=100)
+        return
+    # Fallback: einzelne Bilder fehlen
+    present = [img for img in (img1, img2) if img is not None]
+    if present:
+        st.image(present, caption=list(caption)[:len(present)], width=100)
+    else:
+        st.write("**Karten:** (Bilder fehlen)")
 
 if __name__ == "__main__":
     random.seed()